@@ -12,17 +12,31 @@ import logging
 import os
 import re
 import mysql.connector
+from functools import lru_cache
 from mysql.connector.connection import MySQLConnection
-from typing import List
+from typing import List, Pattern, Tuple
 
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
+FETCH_SIZE = 1024
+
+
+@lru_cache(maxsize=None)
+def _compile(fields: Tuple[str, ...], separator: str) -> Pattern:
+    """Compiles (once per fields/separator pair) the redaction pattern."""
+    return re.compile(f'((?:{"|".join(fields)})=)[^ {separator}]+')
+
+
+@lru_cache(maxsize=None)
+def _template(redaction: str) -> str:
+    """Builds a `re.sub` template keeping the `field=` prefix as-is."""
+    return r'\g<1>' + redaction.replace('\\', r'\\')
 
 
 def filter_datum(fields: List[str], redaction: str, message: str,
                  separator: str) -> str:
     """Obfuscates specified fields in a log message."""
-    pattern = f'({"|".join(fields)})=([^ {separator}]+)'
-    return re.sub(pattern, lambda m: f'{m.group(1)}={redaction}', message)
+    pattern = _compile(tuple(fields), separator)
+    return pattern.sub(_template(redaction), message)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -44,20 +58,37 @@ class RedactingFormatter(logging.Formatter):
         """
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        self._pattern = _compile(tuple(fields), self.SEPARATOR)
+        self._repl = _template(self.REDACTION)
+        self._field_markers = tuple(f"{field}=" for field in fields)
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Format the log record, obfuscating specified fields.
 
+        The record itself is left untouched, so other handlers still
+        see the original message.
+
         Args:
             record (logging.LogRecord): The log record to format.
 
         Returns:
             str: The formatted and obfuscated log record.
         """
-        record.msg = filter_datum(self.fields, self.REDACTION, record.msg,
-                                  self.SEPARATOR)
-        return super(RedactingFormatter, self).format(record)
+        msg = record.getMessage()
+        if any(marker in msg for marker in self._field_markers):
+            msg = self._pattern.sub(self._repl, msg)
+        elif not record.args:
+            return super(RedactingFormatter, self).format(record)
+
+        # Hand over the already rendered message so that it is not
+        # %-formatted a second time by the base class
+        orig_msg, orig_args = record.msg, record.args
+        record.msg, record.args = msg, None
+        try:
+            return super(RedactingFormatter, self).format(record)
+        finally:
+            record.msg, record.args = orig_msg, orig_args
 
 
 def get_logger() -> logging.Logger:
@@ -101,23 +132,89 @@ def get_db() -> MySQLConnection:
         user=username,
         password=password,
         host=host,
-        database=database
+        database=database,
+        use_pure=False
     )
 
+
+def log_batch(logger: logging.Logger, messages: List[str]) -> None:
+    """
+    Log several INFO messages with a single write per handler.
+
+    Each message still becomes its own record, goes through the logger's
+    and the handler's level and filters, and is formatted by the handler's
+    formatter, so the output is the same as calling `logger.info` once per
+    message on a logger that does not propagate (as `get_logger` builds).
+    Errors are reported through `Handler.handleError`. Only a plain
+    `logging.StreamHandler` gets the single write, any other handler
+    (including subclasses such as `FileHandler`) handles each record.
+
+    Args:
+        logger (logging.Logger): The logger to log to.
+        messages (List[str]): The messages to log.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    records = [
+        logger.makeRecord(logger.name, logging.INFO, __file__, 0, msg,
+                          None, None)
+        for msg in messages
+    ]
+    records = [record for record in records if logger.filter(record)]
+
+    for handler in logger.handlers:
+        selected = [
+            record for record in records
+            if record.levelno >= handler.level and handler.filter(record)
+        ]
+        if not selected:
+            continue
+        if type(handler) is not logging.StreamHandler:
+            for record in selected:
+                handler.handle(record)
+            continue
+
+        lines = []
+        for record in selected:
+            try:
+                lines.append(handler.format(record))
+            except Exception:
+                handler.handleError(record)
+        if not lines:
+            continue
+        handler.acquire()
+        try:
+            handler.stream.write(
+                handler.terminator.join(lines) + handler.terminator
+            )
+            handler.flush()
+        except Exception:
+            handler.handleError(selected[-1])
+        finally:
+            handler.release()
+
+
 def main() -> None:
     """
     Main function to retrieve and log data
     from the users table.
     """
     db = get_db()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor(buffered=False)
     cursor.execute("SELECT * FROM users")
+    template = "; ".join(
+        column[0].replace("{", "{{").replace("}", "}}") + "={}"
+        for column in cursor.description
+    )
 
     logger = get_logger()
-    
-    for row in cursor:
-        message = "; ".join(f"{k}={v}" for k, v in row.items())
-        logger.info(message)
+    enabled = logger.isEnabledFor(logging.INFO)
+
+    rows = cursor.fetchmany(FETCH_SIZE)
+    while rows:
+        if enabled:
+            log_batch(logger, [template.format(*row) for row in rows])
+        rows = cursor.fetchmany(FETCH_SIZE)
 
     cursor.close()
     db.close()
\ No newline at end of file
@@ -12,6 +12,12 @@ from api.v1.auth.auth import Auth
 
 auth = None
 
+EXCLUDED_PATHS = (
+    '/api/v1/status/',
+    '/api/v1/unauthorized/',
+    '/api/v1/forbidden/'
+)
+
 
 AUTH_TYPE = getenv("AUTH_TYPE")
 if AUTH_TYPE == "basic_auth":
@@ -53,13 +59,7 @@ def before_request():
     if auth is None:
         return
 
-    excluded_paths = [
-        '/api/v1/status/',
-        '/api/v1/unauthorized/',
-        '/api/v1/forbidden/'
-    ]
-
-    if not auth.require_auth(request.path, excluded_paths):
+    if not auth.require_auth(request.path, EXCLUDED_PATHS):
         return
 
     if auth.authorization_header(request) is None:
@@ -3,11 +3,85 @@
 Auth module for API authentication management
 """
 from flask import request
-from typing import List, TypeVar
-from fnmatch import fnmatch
+from typing import Callable, Dict, List, Tuple, TypeVar
+from fnmatch import translate
+from functools import lru_cache, partial
+import re
 
 User = TypeVar('User')
 
+# Trie node keys; ints never collide with the (str) path characters
+_END, _LOOP, _STAR, _ONE = range(4)
+
+
+def _build_trie(excluded_paths: Tuple[str, ...]) -> Dict:
+    """
+    Builds a character trie of the excluded paths, where `*` and `?`
+    are stored as wildcard edges.
+    """
+    root = {}
+    for excluded_path in excluded_paths:
+        node = root
+        for char in excluded_path.rstrip('/'):
+            if char == '*':
+                node = node.setdefault(_STAR, {_LOOP: True})
+            elif char == '?':
+                node = node.setdefault(_ONE, {})
+            else:
+                node = node.setdefault(char, {})
+        node[_END] = True
+    return root
+
+
+def _closure(nodes: Dict[int, Dict]) -> Dict[int, Dict]:
+    """
+    Adds to `nodes` every node reachable through a `*` matching nothing.
+    """
+    stack = list(nodes.values())
+    while stack:
+        star = stack.pop().get(_STAR)
+        if star is not None and id(star) not in nodes:
+            nodes[id(star)] = star
+            stack.append(star)
+    return nodes
+
+
+def _match_trie(root: Dict, path: str) -> bool:
+    """
+    Walks the trie with `path`, returns True if an excluded path matches.
+    """
+    states = _closure({id(root): root})
+    for char in path:
+        following = {}
+        for node in states.values():
+            for child in (node.get(char), node.get(_ONE)):
+                if child is not None:
+                    following[id(child)] = child
+            if _LOOP in node:
+                following[id(node)] = node
+        if not following:
+            return False
+        states = _closure(following)
+    return any(_END in node for node in states.values())
+
+
+@lru_cache(maxsize=None)
+def _excluded_matcher(
+        excluded_paths: Tuple[str, ...]
+) -> Callable[[str], bool]:
+    """
+    Returns a callable telling if a path matches one of the excluded
+    paths (fnmatch patterns). Patterns made of literals, `*` and `?` use
+    a trie; character classes (`[...]`) fall back to a combined regex.
+    """
+    if any('[' in excluded_path for excluded_path in excluded_paths):
+        pattern = re.compile("|".join(
+            translate(excluded_path.rstrip('/'))
+            for excluded_path in excluded_paths
+        ))
+        return lambda path: pattern.match(path) is not None
+    return partial(_match_trie, _build_trie(excluded_paths))
+
 
 class Auth:
     """Class to manage API authentication"""
@@ -17,18 +91,11 @@ class Auth:
         Method to determine if authentication is required.
         Currently returns False as a placeholder.
         """
-        if path is None:
-            return True
-
-        if excluded_paths is None or not excluded_paths:
+        if path is None or not excluded_paths:
             return True
 
         path = path.rstrip('/')
-        for excluded_path in excluded_paths:
-            if fnmatch(path, excluded_path.rstrip('/')):
-                return False
-
-        return True
+        return not _excluded_matcher(tuple(excluded_paths))(path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -38,7 +105,7 @@ class Auth:
         if request is None:
             return None
 
-        auth_header = request.headers.get("Authorization")
+        auth_header = request.environ.get("HTTP_AUTHORIZATION")
         if auth_header is None:
             return None
 
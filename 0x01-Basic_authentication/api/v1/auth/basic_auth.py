@@ -4,13 +4,61 @@ BasicAuth module for API authentication
 management
 """
 from api.v1.auth.auth import Auth
-import base64
+import binascii
+from functools import lru_cache
 from typing import Tuple, Optional
 from typing import Tuple, Optional, TypeVar
 from models.user import User
 
 UserType = TypeVar('User')
 
+_BASIC_PREFIX = "Basic "
+_BASIC_LEN = len(_BASIC_PREFIX)
+
+_B64_ALPHABET = (
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+)
+
+
+@lru_cache(maxsize=1024)
+def _search_user(user_email: str, revision: int) -> Tuple[UserType, ...]:
+    """
+    Memoized `User.search` by email. The `revision` argument is
+    `User.revision()`, so any save/remove/load invalidates the entry.
+    """
+    return tuple(User.search({'email': user_email}))
+
+
+def _decode_base64(value: str) -> Optional[str]:
+    """
+    Decodes a Base64 string to UTF-8, or returns None if invalid.
+    """
+    data = value.encode('utf-8')
+    if len(data) % 4 or data.translate(None, _B64_ALPHABET):
+        return None
+
+    try:
+        return binascii.a2b_base64(data).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def _user_from_credentials(
+        user_email: str, user_pwd: str
+) -> Optional[UserType]:
+    """
+    Returns the User matching the email and password, or None.
+    """
+    users = _search_user(user_email, User.revision())
+    if not users:
+        return None
+
+    user = users[0]
+    if not user.is_valid_password(user_pwd):
+        return None
+
+    return user
+
 
 class BasicAuth(Auth):
     """Class to manage basic authentication"""
@@ -30,16 +78,13 @@ class BasicAuth(Auth):
             str: The Base64 part of the Authorization
             header or None if invalid.
         """
-        if authorization_header is None:
-            return None
-
         if not isinstance(authorization_header, str):
             return None
 
-        if not authorization_header.startswith("Basic "):
+        if not authorization_header.startswith(_BASIC_PREFIX):
             return None
 
-        return authorization_header[len("Basic "):]
+        return authorization_header[_BASIC_LEN:]
 
     def decode_base64_authorization_header(
             self, base64_authorization_header: str
@@ -55,19 +100,10 @@ class BasicAuth(Auth):
             str: The decoded value as a UTF-8 string or
             None if invalid.
         """
-        if base64_authorization_header is None:
-            return None
-
         if not isinstance(base64_authorization_header, str):
             return None
 
-        try:
-            decoded_bytes = base64.b64decode(
-                base64_authorization_header
-            )
-            return decoded_bytes.decode('utf-8')
-        except Exception:
-            return None
+        return _decode_base64(base64_authorization_header)
 
     def extract_user_credentials(
             self, decoded_base64_authorization_header: str
@@ -84,16 +120,15 @@ class BasicAuth(Auth):
             tuple: The user email and password,
             or (None, None) if invalid.
         """
-        if decoded_base64_authorization_header is None:
-            return None, None
-
         if not isinstance(decoded_base64_authorization_header, str):
             return None, None
 
-        if ':' not in decoded_base64_authorization_header:
+        email, sep, password = decoded_base64_authorization_header.partition(
+            ':'
+        )
+        if not sep:
             return None, None
 
-        email, password = decoded_base64_authorization_header.split(':', 1)
         return email, password
 
     def user_object_from_credentials(
@@ -109,26 +144,19 @@ class BasicAuth(Auth):
         Returns:
             User: The User instance or None if invalid.
         """
-        if user_email is None or not isinstance(user_email, str):
+        if not isinstance(user_email, str) or not isinstance(user_pwd, str):
             return None
 
-        if user_pwd is None or not isinstance(user_pwd, str):
-            return None
-
-        users = User.search({'email': user_email})
-        if not users:
-            return None
-
-        user = users[0]
-        if not user.is_valid_password(user_pwd):
-            return None
-
-        return user
+        return _user_from_credentials(user_email, user_pwd)
 
     def current_user(self, request=None) -> Optional[UserType]:
         """
         Retrieves the User instance for a request.
 
+        The header extraction, decoding and credentials splitting are
+        done inline rather than through the methods above, as this runs
+        on every authenticated request.
+
         Args:
             request: The Flask request object.
 
@@ -138,20 +166,16 @@ class BasicAuth(Auth):
         if request is None:
             return None
 
-        auth_header = self.authorization_header(request)
-        if auth_header is None:
-            return None
-
-        base64_auth = self.extract_base64_authorization_header(auth_header)
-        if base64_auth is None:
+        auth_header = request.environ.get("HTTP_AUTHORIZATION")
+        if auth_header is None or not auth_header.startswith(_BASIC_PREFIX):
             return None
 
-        decoded_auth = self.decode_base64_authorization_header(base64_auth)
+        decoded_auth = _decode_base64(auth_header[_BASIC_LEN:])
         if decoded_auth is None:
             return None
 
-        user_email, user_pwd = self.extract_user_credentials(decoded_auth)
-        if user_email is None or user_pwd is None:
+        user_email, sep, user_pwd = decoded_auth.partition(':')
+        if not sep:
             return None
 
-        return self.user_object_from_credentials(user_email, user_pwd)
+        return _user_from_credentials(user_email, user_pwd)
@@ -10,6 +10,7 @@ import uuid
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
+REVISIONS = {}
 
 
 class Base():
@@ -64,13 +65,12 @@ class Base():
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
         DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
-
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+        if path.exists(file_path):
+            with open(file_path, 'r') as f:
+                objs_json = json.load(f)
+                for obj_id, obj_json in objs_json.items():
+                    DATA[s_class][obj_id] = cls(**obj_json)
+        cls._touch()
 
     @classmethod
     def save_to_file(cls):
@@ -81,6 +81,7 @@ class Base():
         objs_json = {}
         for obj_id, obj in DATA[s_class].items():
             objs_json[obj_id] = obj.to_json(True)
+        cls._touch()
 
         with open(file_path, 'w') as f:
             json.dump(objs_json, f)
@@ -101,6 +102,19 @@ class Base():
             del DATA[s_class][self.id]
             self.__class__.save_to_file()
 
+    @classmethod
+    def _touch(cls):
+        """ Bump the revision of the stored objects
+        """
+        s_class = cls.__name__
+        REVISIONS[s_class] = REVISIONS.get(s_class, 0) + 1
+
+    @classmethod
+    def revision(cls) -> int:
+        """ Revision of the stored objects, changes on every write
+        """
+        return REVISIONS.get(cls.__name__, 0)
+
     @classmethod
     def count(cls) -> int:
         """ Count all objects
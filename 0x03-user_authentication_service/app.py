@@ -6,9 +6,11 @@ This script sets up a Flask web server with a single route ("/")
 that returns a welcome message in JSON format.
 """
 
-from flask import Flask, jsonify, request, abort
-from flask import make_response, redirect, url_for
-from auth import Auth
+import json
+
+from flask import Flask, Response, jsonify, request, abort
+from flask import redirect, url_for
+from auth import Auth, PasswordTooLongError
 
 # Instantiate the Auth object
 AUTH = Auth()
@@ -16,6 +18,23 @@ AUTH = Auth()
 # Initialize the Flask application
 app = Flask(__name__)
 
+# Body of the welcome message, serialized once
+WELCOME_BODY = b'{"message": "Bienvenue"}\n'
+
+# Body of the login response, only the (JSON encoded) email varies
+LOGIN_BODY = b'{"email": %s, "message": "logged in"}\n'
+
+# Body of the profile response
+PROFILE_BODY = b'{"email": %s}\n'
+
+
+@app.teardown_appcontext
+def close_db_session(exception=None) -> None:
+    """
+    Release the database session used while handling the request.
+    """
+    AUTH.close_db_session()
+
 
 @app.route("/", methods=["GET"])
 def welcome():
@@ -25,7 +44,7 @@ def welcome():
     Returns:
         A JSON response with a welcome message.
     """
-    return jsonify({"message": "Bienvenue"})
+    return Response(WELCOME_BODY, mimetype="application/json")
 
 
 @app.route("/users", methods=["POST"])
@@ -43,6 +62,7 @@ def register_user():
     Possible Responses:
         - Success: {"email": "<registered email>", "message": "user created"}
         - Failure: {"message": "email already registered"}, status 400
+        - Failure: {"message": "password too long"}, status 400
     """
     email = request.form.get("email")
     password = request.form.get("password")
@@ -50,6 +70,8 @@ def register_user():
     try:
         user = AUTH.register_user(email, password)
         return jsonify({"email": user.email, "message": "user created"}), 200
+    except PasswordTooLongError:
+        return jsonify({"message": "password too long"}), 400
     except ValueError:
         return jsonify({"message": "email already registered"}), 400
 
@@ -81,10 +103,10 @@ def login():
     session_id = AUTH.create_session(email)
 
     # Prepare the response with the session ID set as a cookie
-    response = make_response(
-        jsonify({"email": email, "message": "logged in"}), 200
+    response = Response(
+        LOGIN_BODY % json.dumps(email).encode(), mimetype="application/json"
     )
-    response.set_cookie("session_id", session_id)
+    response.set_cookie("session_id", session_id, httponly=True)
 
     return response
 
@@ -115,7 +137,10 @@ def profile() -> str:
         abort(403)
 
     # Return the user's email with a 200 status
-    return jsonify({"email": user.email})
+    return Response(
+        PROFILE_BODY % json.dumps(user.email).encode(),
+        mimetype="application/json"
+    )
 
 
 @app.route("/sessions", methods=["DELETE"])
@@ -148,18 +173,7 @@ def logout() -> None:
     AUTH.destroy_session(user.id)
 
     # Redirect the user to the home page
-    return redirect(url_for("index"))
-
-
-@app.route("/", methods=["GET"])
-def index() -> str:
-    """
-    Home route that welcomes the user.
-
-    Returns:
-        str: A simple welcome message.
-    """
-    return jsonify({"message": "Bienvenue"})
+    return redirect(url_for("welcome"))
 
 
 @app.route('/reset_password', methods=['POST'])
@@ -200,6 +214,7 @@ def update_password():
 
     Returns:
         - 200 HTTP status and a JSON payload on success.
+        - 400 HTTP status if the new password is too long.
         - 403 HTTP status if the reset token is invalid.
     """
     # Extract form data from the request
@@ -214,6 +229,8 @@ def update_password():
     try:
         # Update the password
         AUTH.update_password(reset_token, new_password)
+    except PasswordTooLongError:
+        return jsonify({"message": "password too long"}), 400
     except ValueError:
         # If the reset token is invalid, return 403 status code
         return jsonify({"message": "Invalid reset token"}), 403
@@ -4,11 +4,45 @@ This module defines the Auth class for handling user
 registration and authentication.
 """
 
-import uuid
-import bcrypt
+import os
+import secrets
+import threading
+import time
 from db import DB, User
 from sqlalchemy.orm.exc import NoResultFound
-from typing import Optional
+from typing import Dict, Optional, Tuple, Union
+
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Seconds a looked up session is trusted without asking the database again
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "1"))
+
+
+class PasswordTooLongError(ValueError):
+    """Raised for a password bcrypt would silently truncate (or refuse)
+    """
+
+
+def _encode_password(password: str) -> bytes:
+    """
+    Encode a password to be hashed, refusing those over the bcrypt limit.
+
+    Args:
+        password (str): The password to encode.
+
+    Returns:
+        bytes: The UTF-8 encoded password.
+
+    Raises:
+        PasswordTooLongError: If it is over BCRYPT_MAX_PASSWORD_BYTES once
+                              encoded.
+    """
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > BCRYPT_MAX_PASSWORD_BYTES:
+        raise PasswordTooLongError(
+            f"Password is over {BCRYPT_MAX_PASSWORD_BYTES} bytes"
+        )
+    return password_bytes
 
 
 class Auth:
@@ -17,6 +51,37 @@ class Auth:
 
     def __init__(self):
         self._db = DB()
+        # In-process cache of the logged in users: session ID -> (User,
+        # expiry time) and user ID -> session ID, kept in sync by the
+        # session methods below. Other processes sharing the database
+        # cannot evict it, so entries only live SESSION_CACHE_TTL seconds.
+        self._session_cache: Dict[str, Tuple[User, float]] = {}
+        self._user_sessions: Dict[int, str] = {}
+        self._session_cache_lock = threading.Lock()
+        # Bumped by every eviction, so that a lookup racing with a logout
+        # does not cache the session it read before the logout
+        self._session_cache_generation = 0
+
+    def _evict_session(self, user_id: int) -> None:
+        """
+        Drop a user's cached session, if any. Called after the user's
+        session ID changed in the database.
+
+        Args:
+            user_id (int): The ID of the user whose session is dropped.
+        """
+        with self._session_cache_lock:
+            self._session_cache_generation += 1
+            session_id = self._user_sessions.pop(user_id, None)
+            if session_id is not None:
+                self._session_cache.pop(session_id, None)
+
+    def close_db_session(self) -> None:
+        """
+        Release the database session of the current thread, returning its
+        connection to the pool. Meant to be called at the end of a request.
+        """
+        self._db.remove_session()
 
     def get_user_from_session_id(
             self, session_id: Optional[str]
@@ -34,23 +99,36 @@ class Auth:
         if session_id is None:
             return None
 
+        now = time.monotonic()
+        with self._session_cache_lock:
+            entry = self._session_cache.get(session_id)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            generation = self._session_cache_generation
+
         try:
             user = self._db.find_user_by(session_id=session_id)
         except Exception:
             return None
 
+        with self._session_cache_lock:
+            if generation == self._session_cache_generation:
+                self._session_cache[session_id] = (
+                    user, now + SESSION_CACHE_TTL
+                )
+                self._user_sessions[user.id] = session_id
         return user
 
     def _generate_uuid(self) -> str:
         """
-        Generate a new UUID.
+        Generate a new random token, used as session ID and reset token.
 
         This method is private and should not be used outside the auth module.
 
         Returns:
-            str: The string representation of a new UUID.
+            str: A URL-safe token carrying 32 random bytes.
         """
-        return str(uuid.uuid4())
+        return secrets.token_urlsafe(32)
 
     def get_reset_password_token(self, email: str) -> str:
         """
@@ -95,34 +173,32 @@ class Auth:
 
         Raises:
             ValueError: If a user with the given email already exists.
+            PasswordTooLongError: If the password is over
+                                  BCRYPT_MAX_PASSWORD_BYTES (a ValueError).
         """
-        try:
-            # Check if a user with the given email already exists
-            self._db.find_user_by(email=email)
-            # If the user is found, raise a ValueError
+        # Insert the user in one statement, which yields None instead of
+        # a new user if the email is already registered
+        hashed_password = self._hash_password(_encode_password(password))
+        user = self._db.try_insert_user(
+            email=email, hashed_password=hashed_password
+        )
+        if user is None:
             raise ValueError(f"User {email} already exists")
-        except NoResultFound:
-            # If no user is found, proceed to create a new user
-            hashed_password = self._db._hash_password(password)
-            user = self._db.add_user(
-                email=email, hashed_password=hashed_password.decode('utf-8')
-            )
 
-            return user
+        return user
 
-    def _hash_password(self, password: str) -> bytes:
+    def _hash_password(self, password: Union[str, bytes]) -> bytes:
         """
-        Hashes a password string using bcrypt and returns the salted hash.
+        Hashes a password using bcrypt and returns the salted hash.
 
         Args:
-            password (str): The password string to hash.
+            password (str | bytes): The password to hash, either as a
+            string or already UTF-8 encoded.
 
         Returns:
             bytes: The salted hash of the input password.
         """
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed_password
+        return self._db.hash_password(password)
 
     def valid_login(self, email: str, password: str) -> bool:
         """
@@ -135,18 +211,20 @@ class Auth:
         Returns:
             bool: True if the credentials are valid, False otherwise.
         """
-        try:
-            user = self._db.find_user_by(email=email)
-            if isinstance(user.hashed_password, bytes):
-                return bcrypt.checkpw(
-                    password.encode('utf-8'), user.hashed_password
-                )
-            return bcrypt.checkpw(
-                password.encode('utf-8'), user.hashed_password.encode('utf-8')
-            )
-        except NoResultFound:
+        # bcrypt only uses the first 72 bytes of a password, so empty or
+        # longer ones are refused before paying for a hash
+        if not password:
+            return False
+        password_bytes = password.encode('utf-8')
+        if len(password_bytes) > BCRYPT_MAX_PASSWORD_BYTES:
             return False
 
+        hashed_password = self._db.get_password_hash(email)
+        if hashed_password is None:
+            return False
+
+        return self._db.verify_password(password_bytes, hashed_password)
+
     def create_session(self, email: str) -> str:
         """
         Create a new session for the user identified by the provided email.
@@ -160,21 +238,17 @@ class Auth:
         Raises:
             NoResultFound: If no user with the provided email is found.
         """
-        try:
-            # Find the user by email
-            user = self._db.find_user_by(email=email)
-
-            # Generate a new UUID for the session ID
-            session_id = self._generate_uuid()
-
-            # Update the user's session_id with the new UUID
-            self._db.update_user(user.id, session_id=session_id)
+        # Generate a new UUID for the session ID
+        session_id = self._generate_uuid()
 
-            # Return the session ID
-            return session_id
-        except NoResultFound:
+        # Store it on the user with that email, in a single UPDATE
+        user_id = self._db.set_session_by_email(email, session_id)
+        if user_id is None:
             return None
 
+        self._evict_session(user_id)
+        return session_id
+
     def destroy_session(self, user_id: int) -> None:
         """
         Destroy a user's session by setting their session ID to None.
@@ -186,10 +260,10 @@ class Auth:
             None
         """
         try:
-            user = self._db.find_user_by(id=user_id)
-            self._db.update_user(user.id, session_id=None)
+            self._db.update_user(user_id, session_id=None)
         except Exception:
             pass
+        self._evict_session(user_id)
 
     def update_password(self, reset_token: str, password: str) -> None:
         """
@@ -201,7 +275,10 @@ class Auth:
 
         Raises:
             ValueError: If the reset_token does not match any user.
+            PasswordTooLongError: If the password is over
+                                  BCRYPT_MAX_PASSWORD_BYTES (a ValueError).
         """
+        password_bytes = _encode_password(password)
         try:
             # Find the user by reset_token
             user = self._db.find_user_by(reset_token=reset_token)
@@ -210,9 +287,10 @@ class Auth:
             raise ValueError("Invalid reset token")
 
         # Hash the new password
-        hashed_password = self._hash_password(password)
+        hashed_password = self._hash_password(password_bytes)
 
         # Update the user's password and reset_token
         self._db.update_user(
             user.id, hashed_password=hashed_password, reset_token=None
         )
+        self._evict_session(user.id)
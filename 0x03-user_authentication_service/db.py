@@ -7,16 +7,235 @@ for the User model. It includes methods to initialize the database and
 add new users to the database.
 """
 
+import atexit
+import base64
+import multiprocessing
+import os
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import bcrypt
-from sqlalchemy import create_engine
-from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy import (
+    bindparam, create_engine, event, insert, select, update
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import InvalidRequestError, OperationalError
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.orm.session import Session
+from sqlalchemy.pool import QueuePool
+
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+)
 
 from user import Base, User
 
+# Names `update_user` accepts
+_USER_COLUMNS = frozenset(column.name for column in User.__table__.columns)
+
+# bcrypt cost factor, each increment doubles the hashing time. 10 is the
+# lowest value recommended for password storage.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
+
+# Database used by default, e.g. an in-memory one for tests:
+# "sqlite:///file:memdb?mode=memory&cache=shared&uri=true"
+DATABASE_URL = os.getenv("AUTH_DB_URL", "sqlite:///a.db")
+
+# Whether DB() wipes the tables on start, set AUTH_RESET_DB=1 for tests.
+# Never in the bcrypt workers, which import the main module again.
+RESET_DB = (
+    os.getenv("AUTH_RESET_DB") == "1"
+    and multiprocessing.parent_process() is None
+)
+
+# bcrypt salts are "$2b$<cost>$" followed by 16 random bytes encoded in
+# bcrypt's own base64 alphabet. They are drawn SALT_BATCH at a time.
+SALT_BATCH = 256
+_SALT_PREFIX = b"$2b$%02d$" % BCRYPT_ROUNDS
+_B64_TO_BCRYPT = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+)
+_salts = []
+_salts_pid = None
+_salts_lock = threading.Lock()
+
+_BCRYPT_POOL = None
+_BCRYPT_POOL_LOCK = threading.Lock()
+
+
+def _bcrypt_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool running the bcrypt calls, created on first use
+    so that importing this module does not spawn any process.
+
+    The workers are forked only while this is the only thread, e.g. in a
+    script. Otherwise (a threaded server) forking is unsafe and they are
+    spawned, which imports the main module again in each of them.
+
+    Returns:
+        ProcessPoolExecutor: The process-wide bcrypt pool.
+    """
+    global _BCRYPT_POOL
+    with _BCRYPT_POOL_LOCK:
+        if _BCRYPT_POOL is None:
+            if (threading.active_count() == 1
+                    and "fork" in multiprocessing.get_all_start_methods()):
+                context = multiprocessing.get_context("fork")
+            else:
+                context = multiprocessing.get_context("spawn")
+            _BCRYPT_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=context
+            )
+        return _BCRYPT_POOL
+
+
+def _discard_bcrypt_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken bcrypt pool (e.g. a worker was killed), so that the next
+    call creates a new one.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool found broken.
+    """
+    global _BCRYPT_POOL
+    with _BCRYPT_POOL_LOCK:
+        if _BCRYPT_POOL is pool:
+            _BCRYPT_POOL = None
+    pool.shutdown(wait=False)
+
+
+def _bcrypt_call(function: Callable, *args):
+    """
+    Run a bcrypt function on the pool and wait for its result, retrying
+    once on a new pool if the current one is broken.
+
+    Args:
+        function (Callable): `bcrypt.hashpw` or `bcrypt.checkpw`.
+        *args: The arguments of the function.
+
+    Returns:
+        The result of the function.
+    """
+    pool = _bcrypt_pool()
+    try:
+        return pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        _discard_bcrypt_pool(pool)
+        return _bcrypt_pool().submit(function, *args).result()
+
+
+def gensalt() -> bytes:
+    """
+    Return a fresh bcrypt salt for BCRYPT_ROUNDS, like `bcrypt.gensalt`,
+    but reading the random bytes for SALT_BATCH salts at once.
+
+    Returns:
+        bytes: The salt, to be passed to `bcrypt.hashpw`.
+    """
+    global _salts_pid
+    with _salts_lock:
+        # A forked process must not reuse the salts of its parent
+        if _salts_pid != os.getpid():
+            _salts.clear()
+            _salts_pid = os.getpid()
+        if not _salts:
+            raw = os.urandom(16 * SALT_BATCH)
+            _salts.extend(
+                _SALT_PREFIX
+                + base64.b64encode(raw[i:i + 16])[:22].translate(
+                    _B64_TO_BCRYPT
+                )
+                for i in range(0, len(raw), 16)
+            )
+        return _salts.pop()
+
+
+def _as_bytes(hashed_password: Union[str, bytes]) -> bytes:
+    """
+    The `hashed_password` column is binary, hashes given as strings (as
+    `bcrypt.hashpw(...).decode()` would give) are stored UTF-8 encoded.
+    """
+    if isinstance(hashed_password, str):
+        return hashed_password.encode('utf-8')
+    return hashed_password
+
+
+class _ConnectionTurns:
+    """
+    Lets one thread at a time hold connections of a pool, from its first
+    checkout to its last checkin. Threads still waiting block on checkout.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owner: Optional[int] = None
+        self._count = 0
+
+    def checkout(self, *args) -> None:
+        """Pool "checkout" listener, waits for the thread's turn"""
+        if self._owner != threading.get_ident():
+            self._lock.acquire()
+            self._owner = threading.get_ident()
+        self._count += 1
+
+    def checkin(self, *args) -> None:
+        """Pool "checkin" listener, ends the turn with the last connection"""
+        self._count -= 1
+        if self._count == 0:
+            self._owner = None
+            self._lock.release()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune every new SQLite connection: WAL journal so that readers are not
+    blocked by writers, fewer fsyncs per commit, and a 64 MiB page cache.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+def _is_busy(error: Exception) -> bool:
+    """
+    Tells if a statement failed only because another connection held the
+    database ("database is locked" / "database is busy").
+    """
+    if not isinstance(error, OperationalError):
+        return False
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+# DB instances whose deferred users are written at interpreter exit
+_WITH_PENDING = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_pending() -> None:
+    """Write the users still queued by `DB.add_user_deferred`, raising
+    (after trying every instance) if some of them could not be written"""
+    error = None
+    for db in list(_WITH_PENDING):
+        try:
+            db.flush_pending(requeue=False)
+        except Exception as exc:
+            error = error or exc
+    if error is not None:
+        raise error
+
 
 class DB:
     """DB class
@@ -25,58 +244,503 @@ class DB:
     including initializing the database and adding new users.
     """
 
-    def __init__(self) -> None:
+    # Maximum number of `find_user_by` results kept in memory
+    FIND_CACHE_SIZE = 1024
+
+    # Lookups on these columns always go to the database: they change on
+    # login, logout and password reset, possibly in another process
+    FIND_UNCACHED = frozenset(("session_id", "reset_token"))
+
+    # `add_user_deferred` writes once this many users are pending, or
+    # after PENDING_DELAY seconds
+    PENDING_BATCH = 256
+    PENDING_DELAY = 0.1
+    # Flushes a user is retried for while the database is locked or busy
+    PENDING_RETRIES = 50
+
+    def __init__(
+            self, url: str = DATABASE_URL, reset: bool = RESET_DB
+    ) -> None:
         """Initialize a new DB instance
+
+        The tables are created if missing, after dropping them on reset.
+
+        Args:
+            url (str): The SQLite database URL. In-memory databases are
+            opened in shared-cache mode ("file:name?mode=memory&cache=shared
+            &uri=true", a private name is made up for ":memory:"), so that
+            each pooled connection sees the same data. One connection is
+            kept open for the database to live as long as this instance, and
+            threads take turns using it as shared-cache table locks fail
+            instead of waiting.
+            reset (bool): Whether to drop the existing tables and data,
+            which only tests should do.
         """
-        self._engine = create_engine("sqlite:///a.db", echo=False)
-        Base.metadata.drop_all(self._engine)
+        parsed_url = make_url(url)
+        database = parsed_url.database or ":memory:"
+        in_memory = (
+            ":memory:" in database
+            or parsed_url.query.get("mode") == "memory"
+        )
+        if in_memory and parsed_url.query.get("cache") != "shared":
+            # Each connection to ":memory:" would get its own database
+            parsed_url = parsed_url.set(
+                database=f"file:memdb-{uuid.uuid4().hex}",
+                query={"mode": "memory", "cache": "shared", "uri": "true"},
+            )
+        self._engine = create_engine(
+            parsed_url,
+            echo=False,
+            poolclass=QueuePool,
+            pool_size=10,
+            max_overflow=20,
+            # Connections are handed to whichever thread checks them out
+            connect_args={"check_same_thread": False},
+        )
+        self._memory_anchor = None
+        if in_memory:
+            turns = _ConnectionTurns()
+            event.listen(self._engine, "checkout", turns.checkout)
+            event.listen(self._engine, "checkin", turns.checkin)
+            # Opened outside of the pool: the in-memory database is freed
+            # when its last connection closes
+            dialect = self._engine.dialect
+            args, kwargs = dialect.create_connect_args(parsed_url)
+            self._memory_anchor = dialect.connect(*args, **kwargs)
+        event.listen(self._engine, "connect", _set_sqlite_pragmas)
+        if reset:
+            Base.metadata.drop_all(self._engine)
         Base.metadata.create_all(self._engine)
-        self.__session = None
+        # One session per thread. Objects are not expired on commit, so the
+        # users returned by the methods below stay readable once the
+        # session has been released.
+        self._Session = scoped_session(
+            sessionmaker(bind=self._engine, expire_on_commit=False)
+        )
+        # `find_user_by` results by frozenset of criteria, least recently
+        # used first. Emptied on every commit of this instance, which only
+        # covers the writes made by this process.
+        self._find_cache: OrderedDict = OrderedDict()
+        self._find_cache_lock = threading.Lock()
+        self._find_cache_generation = 0
+        # Users queued by `add_user_deferred`, not yet in the database, with
+        # the number of flushes that failed to write them
+        self._pending: List[Tuple[Dict, int]] = []
+        self._pending_lock = threading.Lock()
+        self._pending_timer: Optional[threading.Timer] = None
+        _WITH_PENDING.add(self)
 
     @property
     def _session(self) -> Session:
-        """Memoized session object
+        """Session object of the current thread
+        """
+        return self._Session()
+
+    def remove_session(self) -> None:
+        """Release the current thread's session and its pooled connection
+        """
+        self._Session.remove()
+
+    def _commit(self) -> None:
+        """Commit the current thread's session, then release it
         """
-        if self.__session is None:
-            DBSession = sessionmaker(bind=self._engine)
-            self.__session = DBSession()
-        return self.__session
+        with self._find_cache_lock:
+            self._find_cache.clear()
+            self._find_cache_generation += 1
+        try:
+            self._Session().commit()
+        finally:
+            self._Session.remove()
 
-    def _hash_password(self, password: str) -> bytes:
+    def _hash_password(self, password: Union[str, bytes]) -> bytes:
         """
-        Hashes a password string using bcrypt and returns the salted hash.
+        Hashes a password using bcrypt and returns the salted hash.
 
         Args:
-            password (str): The password string to hash.
+            password (str | bytes): The password to hash, either as a
+            string or already UTF-8 encoded.
 
         Returns:
             bytes: The salted hash of the input password.
         """
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed_password
+        return self.hash_password(password)
 
-    def add_user(self, email: str, hashed_password: str) -> User:
+    def hash_password(self, password: Union[str, bytes]) -> bytes:
+        """
+        Hashes a password on the bcrypt process pool and waits for it,
+        retrying once on a new pool if a worker died.
+
+        Args:
+            password (str | bytes): The password to hash, either as a
+            string or already UTF-8 encoded.
+
+        Returns:
+            bytes: The salted hash of the input password.
+        """
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        return _bcrypt_call(bcrypt.hashpw, password, gensalt())
+
+    def hash_password_async(self, password: Union[str, bytes]) -> Future:
+        """
+        Starts hashing a password on the bcrypt process pool, leaving the
+        calling thread free until it needs the hash.
+
+        Args:
+            password (str | bytes): The password to hash, either as a
+            string or already UTF-8 encoded.
+
+        Returns:
+            Future: A future resolving to the salted hash, as bytes. It
+            raises BrokenProcessPool if a worker dies meanwhile; the next
+            call then starts a new pool.
+        """
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        pool = _bcrypt_pool()
+        try:
+            return pool.submit(bcrypt.hashpw, password, gensalt())
+        except BrokenProcessPool:
+            _discard_bcrypt_pool(pool)
+            return _bcrypt_pool().submit(bcrypt.hashpw, password, gensalt())
+
+    def verify_password(
+            self, password: Union[str, bytes], hashed_password: bytes
+    ) -> bool:
+        """
+        Checks a password against a bcrypt hash, on the bcrypt process pool.
+
+        Args:
+            password (str | bytes): The password to check, either as a
+            string or already UTF-8 encoded.
+            hashed_password (bytes): The salted hash to check it against.
+
+        Returns:
+            bool: True if the password matches the hash.
+        """
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        return _bcrypt_call(bcrypt.checkpw, password, hashed_password)
+
+    def add_user(
+            self, email: str, hashed_password: Union[str, bytes]
+    ) -> User:
         """
         Adds a new user to the database.
 
         Args:
             email (str): The email address of the user.
-            hashed_password (str): The hashed password of the user.
+            hashed_password (str | bytes): The hashed password of the user,
+            stored as bytes (strings are UTF-8 encoded).
 
         Returns:
             User: The newly created `User` object.
         """
-        new_user = User(email=email, hashed_password=hashed_password)
+        # One INSERT statement, bypassing the unit of work
+        statement = insert(User).values(
+            email=email, hashed_password=_as_bytes(hashed_password)
+        )
         session = self._session  # Get the session from the private property
-        session.add(new_user)
-        session.commit()
+        try:
+            if getattr(self._engine.dialect, "insert_returning", False):
+                new_user = session.scalars(statement.returning(User)).one()
+            else:
+                result = session.execute(statement)
+                new_user = session.get(User, result.inserted_primary_key[0])
+        except Exception:
+            # Roll back at once, e.g. on a duplicate email
+            self._Session.remove()
+            raise
+        self._commit()
         return new_user
 
+    def add_user_deferred(
+            self, email: str, hashed_password: Union[str, bytes]
+    ) -> None:
+        """
+        Queues a new user, to be inserted along with other queued users.
+
+        The queue is written in a single transaction once PENDING_BATCH
+        users are waiting, or PENDING_DELAY seconds after the first one was
+        queued. Emails already registered are skipped. Use `add_user` when
+        the user must be stored before returning.
+
+        Args:
+            email (str): The email address of the user.
+            hashed_password (str | bytes): The hashed password of the user,
+            stored as bytes (strings are UTF-8 encoded).
+
+        Raises:
+            ValueError: If the email or the hashed password is missing, so
+                        that a bad row is refused now rather than failing
+                        the batch later.
+        """
+        if not isinstance(email, str) or not email:
+            raise ValueError("email must be a non-empty string")
+        hashed_password = _as_bytes(hashed_password)
+        if not isinstance(hashed_password, bytes) or not hashed_password:
+            raise ValueError("hashed_password must be non-empty bytes")
+
+        with self._pending_lock:
+            self._pending.append(
+                ({"email": email, "hashed_password": hashed_password}, 0)
+            )
+            full = len(self._pending) >= self.PENDING_BATCH
+            if not full:
+                self._schedule_flush()
+        if full:
+            self.flush_pending()
+
+    def _schedule_flush(self) -> None:
+        """
+        Starts the timer flushing the queue, unless one is running. Called
+        with `_pending_lock` held.
+        """
+        if self._pending_timer is None:
+            self._pending_timer = threading.Timer(
+                self.PENDING_DELAY, self.flush_pending
+            )
+            self._pending_timer.daemon = True
+            self._pending_timer.start()
+
+    def flush_pending(self, requeue: bool = True) -> None:
+        """
+        Inserts the users queued by `add_user_deferred` right away.
+
+        If the batch fails, its users are inserted one by one. Those failing
+        because the database is locked or busy go back to the queue, up to
+        PENDING_RETRIES times. The others are dropped, and an error naming
+        them is raised once the rest is stored.
+
+        Args:
+            requeue (bool): Whether users failing on a locked database may
+            go back to the queue. False at exit, where they are reported as
+            not written instead.
+
+        Raises:
+            RuntimeError: If some users could not be written, chained to
+                          the first error met.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+                self._pending_timer = None
+        if not pending:
+            return
+
+        statement = sqlite_insert(User).on_conflict_do_nothing(
+            index_elements=["email"]
+        )
+        try:
+            self._session.execute(statement, [row for row, _ in pending])
+            self._commit()
+            return
+        except Exception:
+            self._Session.remove()
+
+        retry, lost, error = [], [], None
+        for row, failures in pending:
+            try:
+                self._session.execute(statement, row)
+                self._commit()
+            except Exception as exc:
+                self._Session.remove()
+                if (requeue and _is_busy(exc)
+                        and failures + 1 < self.PENDING_RETRIES):
+                    retry.append((row, failures + 1))
+                else:
+                    lost.append(row["email"])
+                    error = error or exc
+
+        if retry:
+            with self._pending_lock:
+                self._pending[:0] = retry
+                self._schedule_flush()
+        if lost:
+            raise RuntimeError(
+                f"{len(lost)} deferred user(s) not written: "
+                + ", ".join(lost)
+            ) from error
+
+    def add_users_bulk(
+            self, pairs: Iterable[Tuple[str, str]]
+    ) -> List[User]:
+        """
+        Adds several users at once, hashing their passwords in parallel.
+
+        The passwords are hashed across the bcrypt process pool and all
+        the users are inserted in a single commit.
+
+        Args:
+            pairs (Iterable[Tuple[str, str]]): The (email, password) pairs
+            of the users to add.
+
+        Returns:
+            List[User]: The newly created `User` objects, in order.
+        """
+        pairs = list(pairs)
+        passwords = [password.encode('utf-8') for _, password in pairs]
+        # Salts are drawn here, the workers only run the hashing
+        salts = [gensalt() for _ in pairs]
+        pool = _bcrypt_pool()
+        try:
+            hashed_passwords = list(
+                pool.map(bcrypt.hashpw, passwords, salts, chunksize=16)
+            )
+        except BrokenProcessPool:
+            _discard_bcrypt_pool(pool)
+            hashed_passwords = list(_bcrypt_pool().map(
+                bcrypt.hashpw, passwords, salts, chunksize=16
+            ))
+        new_users = [
+            User(email=email, hashed_password=hashed_password)
+            for (email, _), hashed_password in zip(pairs, hashed_passwords)
+        ]
+        self._session.add_all(new_users)
+        self._commit()
+        return new_users
+
+    def try_insert_user(
+            self, email: str, hashed_password: Union[str, bytes]
+    ) -> Optional[User]:
+        """
+        Adds a new user unless one with that email already exists, using
+        `INSERT ... ON CONFLICT(email) DO NOTHING`.
+
+        Args:
+            email (str): The email address of the user.
+            hashed_password (str | bytes): The hashed password of the user,
+            stored as bytes (strings are UTF-8 encoded).
+
+        Returns:
+            User: The newly created `User` object, or None if the email is
+            already registered.
+        """
+        statement = sqlite_insert(User).values(
+            email=email, hashed_password=_as_bytes(hashed_password)
+        ).on_conflict_do_nothing(index_elements=["email"])
+        session = self._session
+        try:
+            if getattr(self._engine.dialect, "insert_returning", False):
+                user = session.scalars(
+                    statement.returning(User)
+                ).one_or_none()
+            else:
+                result = session.execute(statement)
+                user = None
+                if result.rowcount:
+                    user = session.get(User, result.inserted_primary_key[0])
+        except Exception:
+            # Roll back at once so the write lock is not held
+            self._Session.remove()
+            raise
+        self._commit()
+        return user
+
+    def set_session_by_email(
+            self, email: str, session_id: str
+    ) -> Optional[int]:
+        """
+        Set the session ID of the user with the given email.
+
+        Uses a single `UPDATE ... RETURNING id` when the dialect supports
+        it, otherwise looks the ID up in the same transaction.
+
+        Args:
+            email (str): The email address of the user.
+            session_id (str): The new session ID.
+
+        Returns:
+            int: The ID of the updated user, or None if no user has
+            that email.
+        """
+        statement = update(User).where(User.email == email).values(
+            session_id=session_id
+        )
+        session = self._session
+        try:
+            if getattr(self._engine.dialect, "update_returning", False):
+                user_id = session.execute(
+                    statement.returning(User.id)
+                ).scalar_one_or_none()
+            else:
+                user_id = session.execute(
+                    select(User.id).where(User.email == email)
+                ).scalar_one_or_none()
+                if user_id is not None:
+                    session.execute(statement)
+        except Exception:
+            # Roll back at once so the write lock is not held
+            self._Session.remove()
+            raise
+        self._commit()
+        return user_id
+
+    def get_password_hash(self, email: str) -> Optional[bytes]:
+        """
+        Fetch only the password hash of the user with the given email.
+
+        Args:
+            email (str): The email address of the user.
+
+        Returns:
+            bytes: The hashed password, or None if no user has that email.
+        """
+        return self._session.execute(
+            select(User.hashed_password).where(User.email == email)
+        ).scalar_one_or_none()
+
+    def iter_users_columns(self, *columns: str) -> Iterator[Tuple]:
+        """
+        Stream some columns of every user, without building `User` objects.
+
+        Rows are fetched 1000 at a time on a connection of their own, so
+        the current thread's session is left untouched.
+
+        Args:
+            *columns (str): The names of the columns to read.
+
+        Returns:
+            Iterator[Tuple]: One tuple of the requested values per user.
+
+        Raises:
+            ValueError: If a name is not a column of User.
+        """
+        for column in columns:
+            if column not in _USER_COLUMNS:
+                raise ValueError(f"{column} is not a valid attribute of User")
+        statement = select(*(getattr(User, column) for column in columns))
+
+        def rows() -> Iterator[Tuple]:
+            with self._engine.connect() as connection:
+                result = connection.execution_options(
+                    yield_per=1000
+                ).execute(statement)
+                for row in result:
+                    yield tuple(row)
+
+        return rows()
+
+    def iter_emails(self) -> Iterator[str]:
+        """
+        Stream the email of every user.
+
+        Returns:
+            Iterator[str]: The emails, in no particular order.
+        """
+        return (email for email, in self.iter_users_columns("email"))
+
     def find_user_by(self, **kwargs) -> User:
         """
         Find a user in the database by arbitrary keyword arguments.
 
+        Results are kept in an LRU cache of FIND_CACHE_SIZE entries, which
+        is emptied by every write made through this instance. Writes made
+        by other processes are not seen by cached lookups, so the cache is
+        only exact with a single process; lookups involving FIND_UNCACHED
+        columns are never cached for that reason.
+
         Args:
             **kwargs: Arbitrary keyword arguments representing the field(s)
                       and value(s) to filter the users.
@@ -88,9 +752,45 @@ class DB:
             NoResultFound: If no user is found with the specified criteria.
             InvalidRequestError: If invalid query arguments are provided.
         """
+        if not self.FIND_UNCACHED.isdisjoint(kwargs):
+            return self._find_user_by(**kwargs)
+        try:
+            key = frozenset(kwargs.items())
+        except TypeError:
+            # Unhashable values are not cached
+            return self._find_user_by(**kwargs)
+
+        with self._find_cache_lock:
+            user = self._find_cache.get(key)
+            if user is not None:
+                self._find_cache.move_to_end(key)
+                return user
+            generation = self._find_cache_generation
+
+        user = self._find_user_by(**kwargs)
+        with self._find_cache_lock:
+            # Do not store what a concurrent write may have made stale
+            if generation != self._find_cache_generation:
+                return user
+            self._find_cache[key] = user
+            if len(self._find_cache) > self.FIND_CACHE_SIZE:
+                self._find_cache.popitem(last=False)
+        return user
+
+    def _find_user_by(self, **kwargs) -> User:
+        """
+        Uncached `find_user_by`, returning a user attached to the current
+        thread's session.
+        """
         try:
-            user = self._session.query(User).filter_by(**kwargs).one()
-            return user
+            if len(kwargs) == 1:
+                (key, value), = kwargs.items()
+                finder = _FINDERS.get(key)
+                if finder is not None and value is not None:
+                    return finder(self, value)
+            return self._session.execute(
+                select(User).filter_by(**kwargs)
+            ).scalar_one()
         except NoResultFound:
             raise NoResultFound("No user found with the provided criteria.")
         except InvalidRequestError:
@@ -103,7 +803,8 @@ class DB:
         Args:
             user_id (int): The ID of the user to update.
             **kwargs: Arbitrary keyword arguments representing the field(s)
-                      and value(s) to update the user with.
+                      and value(s) to update the user with. A
+                      `hashed_password` string is stored UTF-8 encoded.
 
         Returns:
             None
@@ -111,10 +812,64 @@ class DB:
         Raises:
             ValueError: If an argument that does not correspond to a user
                         attribute is passed.
+            NoResultFound: If no user has the given ID.
         """
-        user = self.find_user_by(id=user_id)
-        for key, value in kwargs.items():
-            if not hasattr(user, key):
+        for key in kwargs:
+            if key not in _USER_COLUMNS:
                 raise ValueError(f"{key} is not a valid attribute of User")
-            setattr(user, key, value)
-        self._session.commit()
+        if "hashed_password" in kwargs:
+            kwargs["hashed_password"] = _as_bytes(kwargs["hashed_password"])
+
+        if not kwargs:
+            # Nothing to write, only check that the user exists
+            exists = self._session.execute(
+                select(User.id).where(User.id == user_id)
+            ).scalar_one_or_none()
+            if exists is None:
+                raise NoResultFound(
+                    "No user found with the provided criteria."
+                )
+            return
+
+        # A single UPDATE, without loading the user first
+        try:
+            result = self._session.execute(
+                update(User).where(User.id == user_id).values(**kwargs),
+                execution_options={"synchronize_session": False},
+            )
+        except Exception:
+            # Roll back at once, e.g. on an email already taken
+            self._Session.remove()
+            raise
+        self._commit()
+        if result.rowcount == 0:
+            raise NoResultFound("No user found with the provided criteria.")
+
+
+def _make_finder(column: str) -> Callable[[DB, object], User]:
+    """
+    Build a `DB` method looking a user up by one indexed column, with its
+    statement prebuilt.
+    """
+    statement = select(User).where(
+        getattr(User, column) == bindparam("value")
+    )
+
+    def finder(self: DB, value: object) -> User:
+        return self._session.execute(
+            statement, {"value": value}
+        ).scalar_one()
+
+    finder.__name__ = f"_find_by_{column}"
+    finder.__qualname__ = f"DB._find_by_{column}"
+    finder.__doc__ = f"Find the user whose `{column}` is `value`."
+    return finder
+
+
+# DB._find_by_id, _find_by_email, ... : fast paths for the columns
+# `find_user_by` is called with
+_FINDERS = {}
+for _column in ("id", "email", "session_id", "reset_token"):
+    _FINDERS[_column] = _make_finder(_column)
+    setattr(DB, _FINDERS[_column].__name__, _FINDERS[_column])
+del _column
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Optional build script compiling the `auth` and `app` modules with Cython.
+
+The modules are compiled as is (pure Python mode), so `auth.py` and
+`app.py` stay the importable fallback when no extension has been built:
+
+    python3 setup.py build_ext --inplace
+
+Once built, the extension modules are imported in place of the sources.
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="user_authentication_service",
+    ext_modules=cythonize(
+        ["auth.py", "app.py"],
+        compiler_directives={
+            "language_level": 3,
+            # Keep the annotations as hints only, so that calls such as
+            # `valid_login(None, None)` behave as in pure Python
+            "annotation_typing": False,
+        },
+    ),
+)
@@ -8,7 +8,7 @@ email address, hashed password, session ID, and password reset token,
 respectively.
 """
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, LargeBinary, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -20,15 +20,18 @@ class User(Base):
 
     Attributes:
         id (int): The primary key of the user.
-        email (str): The email address of the user. Non-nullable.
-        hashed_password (str): The hashed password of the user. Non-nullable.
-        session_id (str): The session identifier of the user. Nullable.
-        reset_token (str): The reset token for password recovery. Nullable.
+        email (str): The email address of the user. Non-nullable, unique.
+        hashed_password (bytes): The bcrypt hash of the user's password.
+            Non-nullable.
+        session_id (str): The session identifier of the user. Nullable,
+            unique.
+        reset_token (str): The reset token for password recovery. Nullable,
+            unique.
     """
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)
-    email = Column(String, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    session_id = Column(String, nullable=True)
-    reset_token = Column(String, nullable=True)
+    email = Column(String, nullable=False, index=True, unique=True)
+    hashed_password = Column(LargeBinary, nullable=False)
+    session_id = Column(String, nullable=True, index=True, unique=True)
+    reset_token = Column(String, nullable=True, index=True, unique=True)